@@ -3,12 +3,25 @@ NetSentry - Cloud-Based Network Traffic Analysis System
 Stage 1: Local REST API Service
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-from collections import defaultdict
+from fastapi.responses import ORJSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.exception_handlers import http_exception_handler as default_http_exception_handler
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from pydantic import BaseModel, ConfigDict, Field, AfterValidator, TypeAdapter, ValidationError, field_validator
+from typing import List, Optional, Dict, Any, Deque, Literal, Annotated
+from datetime import datetime, timezone
+from collections import Counter, defaultdict, deque
+from contextlib import asynccontextmanager
+from cachetools import TTLCache, cached
+import asyncio
+import bisect
+import itertools
+import threading
+import time
+import json
 import re
 import subprocess
 import socket
@@ -17,14 +30,90 @@ import psutil
 import ipaddress
 import os
 import joblib
+import onnxruntime as ort
+import orjson
 import pandas as pd
 import numpy as np
 
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """JSON response rendered by orjson, which also serializes NumPy scalars and arrays"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+class UTCClock:
+    """
+    Second-granularity UTC ISO timestamp shared by all requests. A background task
+    refreshes it once per second so request handlers don't format a datetime each time.
+    """
+
+    def __init__(self, interval_seconds: float = 1.0):
+        self.interval_seconds = interval_seconds
+        self._now_iso: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _format() -> str:
+        return datetime.utcnow().replace(microsecond=0).isoformat()
+
+    def start(self):
+        """Start the refresh task on the running event loop"""
+        if self._task is None or self._task.done():
+            self._now_iso = self._format()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the refresh task; now_iso() formats on every call again"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._now_iso = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            self._now_iso = self._format()
+
+    def now_iso(self) -> str:
+        """Current UTC time as an ISO string, at most one refresh interval old"""
+        return self._now_iso if self._now_iso is not None else self._format()
+
+
+# Started in the lifespan; outside a running app now_iso() falls back to formatting per call
+utc_clock = UTCClock()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load ML models and start background workers on startup; stop them on shutdown"""
+    global models_loaded, ml_status_body
+    # Loaded here rather than at import so each server worker loads its own copy
+    # once, and processes that only import the module (e.g. the uvicorn
+    # supervisor under --workers) never deserialize the models
+    models_loaded = load_ml_models()
+    ml_status_body = None
+    utc_clock.start()
+    for batcher in prediction_batchers.values():
+        batcher.start()
+    yield
+    for batcher in prediction_batchers.values():
+        await batcher.stop()
+    await utc_clock.stop()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="NetSentry API",
     description="Network Anomaly Detection System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=NumpyORJSONResponse
 )
 
 # ============================================
@@ -37,20 +126,101 @@ ml_models = {
     'multi': None,
     'encoders': None,
     'features': None,
-    'attack_mapping': None
+    'attack_mapping': None,
+    # ONNX Runtime sessions exported from the forests (see modelBuilding/export_onnx.py).
+    # When a session is available the matching sklearn pickle is not loaded at all.
+    'binary_onnx': None,
+    'multi_onnx': None,
+    # Multi-threaded sessions for large batches (only when INFERENCE_THREADS > 1)
+    'binary_onnx_parallel': None,
+    'multi_onnx_parallel': None,
+    # Class labels in probability-column order, from whichever model was loaded
+    'binary_classes': None,
+    'multi_classes': None,
+    # Uppercased multi-class labels used in responses, same order as multi_classes
+    'multi_labels': None,
+    # Per training column: (MLFeatures field, {category: code} or None), built at load time
+    'feature_plan': None
 }
 
+
+# Single requests and small batches run single-threaded (uvicorn workers provide the
+# parallelism); batches of at least PARALLEL_BATCH_MIN_ROWS rows spread the trees over
+# this worker's share of the cores
+PARALLEL_BATCH_MIN_ROWS = 32
+INFERENCE_THREADS = max(1, (os.cpu_count() or 1) // max(1, int(os.getenv('WEB_CONCURRENCY', 1))))
+
+
+def create_onnx_session(onnx_path: str, threads: int) -> ort.InferenceSession:
+    """Open an ONNX Runtime session using `threads` intra-op threads, warmed up with one run"""
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+    # One throwaway run so the tree ensemble kernel is built at startup, not on the first request
+    model_input = session.get_inputs()[0]
+    session.run(None, {model_input.name: np.zeros((1, model_input.shape[1]), dtype=np.float32)})
+    return session
+
+
+def load_classifier(models_dir: str, model_key: str, name: str):
+    """
+    Load one classifier for serving. Prefers the ONNX export and reads its class
+    labels from the model metadata; the sklearn pickle is only a fallback.
+    """
+    onnx_path = os.path.join(models_dir, name + '.onnx')
+    if os.path.exists(onnx_path):
+        session = create_onnx_session(onnx_path, 1)
+        classes = session.get_modelmeta().custom_metadata_map.get('classes')
+        if classes is not None:
+            ml_models[model_key + '_onnx'] = session
+            if INFERENCE_THREADS > 1:
+                ml_models[model_key + '_onnx_parallel'] = create_onnx_session(onnx_path, INFERENCE_THREADS)
+            ml_models[model_key + '_classes'] = np.array(json.loads(classes))
+            return
+        print(f"⚠ ONNX model has no class metadata, re-run export_onnx.py: {onnx_path}")
+    else:
+        print(f"⚠ ONNX model not found, using scikit-learn for inference: {onnx_path}")
+
+    clf = joblib.load(os.path.join(models_dir, name + '.pkl'))
+    # Trained with n_jobs=-1/verbose=1; that would set up a joblib pool and log progress
+    # on every predict call, competing with the other workers for cores. With n_jobs=None
+    # predicts are single-threaded unless predict_proba_batch opens a parallel backend
+    clf.n_jobs = None
+    clf.verbose = 0
+    ml_models[model_key] = clf
+    ml_models[model_key + '_classes'] = clf.classes_
+
+
+def build_feature_plan(features: List[str], encoders: Dict[str, Any]) -> tuple:
+    """
+    Precompute how each training column is filled from an MLFeatures request.
+    '<col>_encoded' columns map back to the raw categorical field through a plain
+    dict lookup (LabelEncoder codes are the index into its sorted classes_).
+    """
+    plan = []
+    for feature in features:
+        base = feature[:-len('_encoded')] if feature.endswith('_encoded') else None
+        if base in encoders:
+            plan.append((base, {cls: code for code, cls in enumerate(encoders[base].classes_.tolist())}))
+        else:
+            plan.append((feature, None))
+    return tuple(plan)
+
+
 def load_ml_models():
     """Load trained Random Forest models and preprocessors"""
     models_dir = os.path.join(os.path.dirname(__file__), 'modelBuilding', 'models')
     
     try:
         if os.path.exists(models_dir):
-            ml_models['binary'] = joblib.load(os.path.join(models_dir, 'rf_binary_classifier.pkl'))
-            ml_models['multi'] = joblib.load(os.path.join(models_dir, 'rf_multiclass_classifier.pkl'))
+            load_classifier(models_dir, 'binary', 'rf_binary_classifier')
+            load_classifier(models_dir, 'multi', 'rf_multiclass_classifier')
+            ml_models['multi_labels'] = [str(cls).upper() for cls in ml_models['multi_classes']]
             ml_models['encoders'] = joblib.load(os.path.join(models_dir, 'label_encoders.pkl'))
             ml_models['features'] = joblib.load(os.path.join(models_dir, 'feature_columns.pkl'))
             ml_models['attack_mapping'] = joblib.load(os.path.join(models_dir, 'attack_mapping.pkl'))
+            ml_models['feature_plan'] = build_feature_plan(ml_models['features'], ml_models['encoders'])
             print("✓ ML models loaded successfully")
             return True
         else:
@@ -60,8 +230,13 @@ def load_ml_models():
         print(f"⚠ Failed to load ML models: {str(e)}")
         return False
 
-# Load models on startup
-models_loaded = load_ml_models()
+
+def model_available(model_key: str) -> bool:
+    """Check whether the ONNX session or the sklearn fallback is loaded for a model"""
+    return ml_models[model_key + '_classes'] is not None
+
+# Set by load_ml_models() in the app lifespan (see lifespan above)
+models_loaded = False
 
 # Configure CORS to allow frontend access
 # Note: Using regex pattern to allow all localhost/127.0.0.1 origins during development
@@ -73,32 +248,55 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+
+# FastAPI's built-in handlers render errors with the stdlib JSONResponse regardless of
+# default_response_class; these keep 4xx/5xx bodies on orjson like every other response
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """Render HTTPException details (including 404/405 from routing) with orjson"""
+    if exc.status_code < 200 or exc.status_code in (204, 205, 304):
+        return await default_http_exception_handler(request, exc)
+    return NumpyORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=getattr(exc, "headers", None))
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """Render request validation errors (422) with orjson"""
+    return NumpyORJSONResponse({"detail": jsonable_encoder(exc.errors())}, status_code=422)
+
 # ============================================
 # Data Models
 # ============================================
 
+def validate_ipv4(v: str) -> str:
+    """IPv4 validation (rejects out-of-range octets such as 999.1.1.1)"""
+    try:
+        ipaddress.IPv4Address(v)
+    except ValueError:
+        raise ValueError(f'Invalid IP address format: {v}')
+    return v
+
+
+IPv4Str = Annotated[str, AfterValidator(validate_ipv4)]
+
+
 class NetworkLog(BaseModel):
     """Model for incoming network traffic log"""
-    src_ip: str = Field(..., description="Source IP address")
-    dst_ip: str = Field(..., description="Destination IP address")
-    protocol: str = Field(..., description="Protocol (TCP, UDP, HTTP, DNS)")
+    src_ip: IPv4Str = Field(..., description="Source IP address")
+    dst_ip: IPv4Str = Field(..., description="Destination IP address")
+    protocol: Literal['TCP', 'UDP', 'HTTP', 'DNS', 'HTTPS'] = Field(..., description="Protocol (TCP, UDP, HTTP, DNS)")
     payload: Optional[str] = Field(None, description="Payload data or log message")
-    timestamp: Optional[str] = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: Optional[str] = Field(default_factory=utc_clock.now_iso)
     
-    @validator('src_ip', 'dst_ip')
-    def validate_ip(cls, v):
-        """Basic IP validation"""
-        if not re.match(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$', v):
-            raise ValueError(f'Invalid IP address format: {v}')
-        return v
-    
-    @validator('protocol')
-    def validate_protocol(cls, v):
-        """Validate protocol type"""
-        valid_protocols = ['TCP', 'UDP', 'HTTP', 'DNS', 'HTTPS']
-        if v.upper() not in valid_protocols:
-            raise ValueError(f'Protocol must be one of {valid_protocols}')
-        return v.upper()
+    @field_validator('protocol', mode='before')
+    @classmethod
+    def normalize_protocol(cls, v):
+        """Accept protocol names in any case; the Literal check then runs in pydantic-core"""
+        return v.upper() if isinstance(v, str) else v
+
+
+# Validates a whole NDJSON batch of logs in one call
+network_log_list_adapter = TypeAdapter(List[NetworkLog])
 
 
 class Alert(BaseModel):
@@ -121,6 +319,13 @@ class AnalysisResponse(BaseModel):
     message: str
 
 
+class BatchAnalysisResponse(BaseModel):
+    """Response model for /analyze/batch endpoint"""
+    status: str
+    alerts: List[List[Alert]]  # One list per input log, in input order
+    message: str
+
+
 class HealthResponse(BaseModel):
     """Response model for /health endpoint"""
     status: str
@@ -212,6 +417,9 @@ class MLFeatures(BaseModel):
 
 class MLPredictionResponse(BaseModel):
     """Response model for ML prediction endpoints"""
+    # model_available is part of the public response, not a pydantic attribute
+    model_config = ConfigDict(protected_namespaces=())
+
     status: str
     model_available: bool
     prediction: Optional[str] = None
@@ -226,19 +434,49 @@ class MLPredictionResponse(BaseModel):
 # In-Memory Storage (for Stage 1)
 # ============================================
 
-# Store all alerts
-alerts_database: List[Alert] = []
+# Store the most recent alerts; the oldest are evicted once the buffer is full.
+# Size is configurable with the ALERT_BUFFER environment variable (at least 1)
+MAX_STORED_ALERTS = max(1, int(os.getenv('ALERT_BUFFER', 10_000)))
+alerts_database: Deque[Alert] = deque(maxlen=MAX_STORED_ALERTS)
+
+# Monotonic alert sequence, independent of how many alerts are currently stored
+alert_sequence = itertools.count(1)
 
-# Track login attempts per IP (for rate limiting detection)
-login_attempts: Dict[str, List[str]] = defaultdict(list)
+# Counts of stored alerts per severity / alert type, maintained by store_alert()
+severity_counter: Counter = Counter()
+type_counter: Counter = Counter()
 
-# Suspicious IP blacklist
-SUSPICIOUS_IPS = {
+# Login attempt detection: alert when LOGIN_ATTEMPT_THRESHOLD attempts from one IP
+# fall within LOGIN_ATTEMPT_WINDOW_SECONDS
+LOGIN_ATTEMPT_THRESHOLD = 5
+LOGIN_ATTEMPT_WINDOW_SECONDS = 60
+LOGIN_ATTEMPT_HISTORY = 10
+
+# Track recent login attempt times (epoch seconds) per IP, bounded per IP.
+# Keyed by the packed 32-bit address (see ip_to_int) rather than the string
+login_attempts: Dict[int, Deque[float]] = defaultdict(lambda: deque(maxlen=LOGIN_ATTEMPT_HISTORY))
+
+# Suspicious IP blacklist (single addresses or CIDR ranges), read-only at runtime
+SUSPICIOUS_IPS = frozenset({
     '192.168.100.100',
-    '10.0.0.666',  # Obviously fake but for demo
     '172.16.0.100',
-    '203.0.113.0',  # TEST-NET-3 (RFC 5737)
-}
+    '203.0.113.0/24',  # TEST-NET-3 (RFC 5737)
+})
+
+
+def build_ip_ranges(entries) -> tuple:
+    """
+    Collapse blacklist entries into sorted, non-overlapping [start, end] integer ranges,
+    so a lookup is one bisect over packed addresses however many CIDRs are listed
+    """
+    starts, ends = [], []
+    for network in ipaddress.collapse_addresses(ipaddress.IPv4Network(entry) for entry in entries):
+        starts.append(int(network.network_address))
+        ends.append(int(network.broadcast_address))
+    return starts, ends
+
+
+SUSPICIOUS_IP_STARTS, SUSPICIOUS_IP_ENDS = build_ip_ranges(SUSPICIOUS_IPS)
 
 # Suspicious DNS patterns   
 SUSPICIOUS_DNS_PATTERNS = [
@@ -251,6 +489,13 @@ SUSPICIOUS_DNS_PATTERNS = [
     r'[a-f0-9]{32,}',  # Long hex strings (possible C2 communication)
 ]
 
+# Union of the DNS patterns, compiled once. Each pattern gets a named group
+# (p0, p1, ...) so the one that matched is recovered from match.lastgroup
+SUSPICIOUS_DNS_RE = re.compile(
+    '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(SUSPICIOUS_DNS_PATTERNS)),
+    re.IGNORECASE
+)
+
 # HTTP suspicious patterns
 HTTP_SUSPICIOUS_KEYWORDS = [
     'login',
@@ -261,6 +506,13 @@ HTTP_SUSPICIOUS_KEYWORDS = [
     'authenticate'
 ]
 
+# All keywords folded into one case-insensitive pattern, compiled once so the
+# payload is scanned in a single pass without building a lowercased copy
+HTTP_SUSPICIOUS_KEYWORDS_RE = re.compile(
+    '|'.join(re.escape(keyword) for keyword in HTTP_SUSPICIOUS_KEYWORDS),
+    re.IGNORECASE
+)
+
 
 # ============================================
 # Anomaly Detection Logic
@@ -268,14 +520,40 @@ HTTP_SUSPICIOUS_KEYWORDS = [
 
 def generate_alert_id() -> str:
     """Generate unique alert ID"""
-    return f"ALERT-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{len(alerts_database) + 1}"
+    return f"ALERT-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{next(alert_sequence)}"
+
+
+def ip_to_int(ip: str) -> int:
+    """Packed 32-bit value of a (validated) dotted-quad IPv4 address"""
+    return int.from_bytes(socket.inet_aton(ip), 'big')
+
+
+def is_suspicious_ip(ip: str) -> bool:
+    """Check whether an address falls in any blacklisted range"""
+    address = ip_to_int(ip)
+    index = bisect.bisect_right(SUSPICIOUS_IP_STARTS, address) - 1
+    return index >= 0 and address <= SUSPICIOUS_IP_ENDS[index]
+
+
+def store_alert(alert: Alert):
+    """
+    Add an alert to the store and update the /stats counters, including for
+    the oldest alert when the bounded store evicts it
+    """
+    if alerts_database and len(alerts_database) == alerts_database.maxlen:
+        evicted = alerts_database[0]
+        severity_counter[evicted.severity] -= 1
+        type_counter[evicted.alert_type] -= 1
+    alerts_database.append(alert)
+    severity_counter[alert.severity] += 1
+    type_counter[alert.alert_type] += 1
 
 
 def check_suspicious_ip(log: NetworkLog) -> Optional[Alert]:
     """
     Rule 1: Check if source IP is in suspicious IP list
     """
-    if log.src_ip in SUSPICIOUS_IPS:
+    if is_suspicious_ip(log.src_ip):
         return Alert(
             alert_id=generate_alert_id(),
             severity="HIGH",
@@ -290,26 +568,37 @@ def check_suspicious_ip(log: NetworkLog) -> Optional[Alert]:
     return None
 
 
+def log_epoch(log: NetworkLog) -> float:
+    """Epoch seconds of a log's ISO timestamp (naive means UTC); arrival time if unparsable"""
+    try:
+        # fromisoformat() only accepts a 'Z' suffix from Python 3.11 on
+        ts = datetime.fromisoformat(log.timestamp.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return time.time()
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
 def check_login_attempts(log: NetworkLog) -> Optional[Alert]:
     """
     Rule 2: Detect too many login attempts from same IP (HTTP)
-    Threshold: 5 attempts within the tracking window
+    Threshold: 5 attempts within 60 seconds
     """
     if log.protocol == 'HTTP' and log.payload:
-        payload_lower = log.payload.lower()
-        
         # Check if payload contains login-related keywords
-        if any(keyword in payload_lower for keyword in HTTP_SUSPICIOUS_KEYWORDS):
-            # Track this attempt
-            login_attempts[log.src_ip].append(log.timestamp)
-            
-            # Keep only recent attempts (simple implementation for demo)
-            # In production, you'd implement time-window logic
-            if len(login_attempts[log.src_ip]) > 10:
-                login_attempts[log.src_ip] = login_attempts[log.src_ip][-10:]
+        if HTTP_SUSPICIOUS_KEYWORDS_RE.search(log.payload):
+            # Track this attempt (the deque drops the oldest beyond LOGIN_ATTEMPT_HISTORY)
+            now = log_epoch(log)
+            attempts = login_attempts[ip_to_int(log.src_ip)]
+            attempts.append(now)
             
-            # Check threshold
-            if len(login_attempts[log.src_ip]) >= 5:
+            # Check threshold: the last N attempts span less than the window. Batches and
+            # replays deliver logs out of timestamp order, so use their spread rather than
+            # the distance from the newest arrival
+            recent = list(itertools.islice(reversed(attempts), LOGIN_ATTEMPT_THRESHOLD))
+            if (len(recent) == LOGIN_ATTEMPT_THRESHOLD
+                    and max(recent) - min(recent) < LOGIN_ATTEMPT_WINDOW_SECONDS):
                 return Alert(
                     alert_id=generate_alert_id(),
                     severity="MEDIUM",
@@ -320,7 +609,7 @@ def check_login_attempts(log: NetworkLog) -> Optional[Alert]:
                     protocol=log.protocol,
                     timestamp=log.timestamp,
                     metadata={
-                        "attempt_count": len(login_attempts[log.src_ip]),
+                        "attempt_count": sum(1 for t in attempts if abs(now - t) < LOGIN_ATTEMPT_WINDOW_SECONDS),
                         "payload_snippet": log.payload[:100]
                     }
                 )
@@ -332,47 +621,48 @@ def check_suspicious_dns(log: NetworkLog) -> Optional[Alert]:
     Rule 3: Detect suspicious DNS queries
     """
     if log.protocol == 'DNS' and log.payload:
-        payload_lower = log.payload.lower()
-        
-        # Check against suspicious patterns
-        for pattern in SUSPICIOUS_DNS_PATTERNS:
-            if re.search(pattern, payload_lower):
-                return Alert(
-                    alert_id=generate_alert_id(),
-                    severity="HIGH",
-                    alert_type="SUSPICIOUS_DNS_QUERY",
-                    description=f"Suspicious DNS query detected: {log.payload}",
-                    src_ip=log.src_ip,
-                    dst_ip=log.dst_ip,
-                    protocol=log.protocol,
-                    timestamp=log.timestamp,
-                    metadata={
-                        "query": log.payload,
-                        "matched_pattern": pattern
-                    }
-                )
+        # Check against all suspicious patterns in a single pass
+        match = SUSPICIOUS_DNS_RE.search(log.payload)
+        if match:
+            return Alert(
+                alert_id=generate_alert_id(),
+                severity="HIGH",
+                alert_type="SUSPICIOUS_DNS_QUERY",
+                description=f"Suspicious DNS query detected: {log.payload}",
+                src_ip=log.src_ip,
+                dst_ip=log.dst_ip,
+                protocol=log.protocol,
+                timestamp=log.timestamp,
+                metadata={
+                    "query": log.payload,
+                    "matched_pattern": SUSPICIOUS_DNS_PATTERNS[int(match.lastgroup[1:])]
+                }
+            )
     return None
 
 
+# Detection rules per protocol. The IP blacklist applies to all traffic; the
+# payload rules only ever fire for their own protocol, so they are not run otherwise
+DEFAULT_DETECTION_RULES = (check_suspicious_ip,)
+DETECTION_RULES = {
+    'HTTP': (check_suspicious_ip, check_login_attempts),
+    'DNS': (check_suspicious_ip, check_suspicious_dns),
+}
+
+
 def analyze_log(log: NetworkLog) -> List[Alert]:
     """
-    Main analysis function - runs all detection rules
+    Main analysis function - runs the detection rules for the log's protocol
     Returns list of alerts generated for this log
     """
     detected_alerts = []
     
-    # Run all detection rules
-    detection_rules = [
-        check_suspicious_ip,
-        check_login_attempts,
-        check_suspicious_dns
-    ]
-    
-    for rule in detection_rules:
+    # Run only the detection rules that apply to this protocol
+    for rule in DETECTION_RULES.get(log.protocol, DEFAULT_DETECTION_RULES):
         alert = rule(log)
         if alert:
             detected_alerts.append(alert)
-            alerts_database.append(alert)  # Store in database
+            store_alert(alert)  # Store in database
     
     return detected_alerts
 
@@ -381,13 +671,25 @@ def analyze_log(log: NetworkLog) -> List[Alert]:
 # Network Scanning Functions
 # ============================================
 
+# Routing, DNS and interface configuration rarely change between scans, so these
+# helpers are memoized briefly instead of re-running subprocesses on every request.
+# Gateway and DNS servers are static config; interfaces carry live byte counters
+ROUTING_INFO_TTL_SECONDS = 60
+NETWORK_INFO_TTL_SECONDS = 10
+INTERFACE_ADDRS_TTL_SECONDS = 2
+
+
+@cached(cache=TTLCache(maxsize=1, ttl=INTERFACE_ADDRS_TTL_SECONDS), lock=threading.Lock())
+def get_interface_addresses() -> Dict[str, list]:
+    """psutil.net_if_addrs(), shared by the scan helpers"""
+    return psutil.net_if_addrs()
 
 
 def get_local_ip_and_network() -> tuple:
     """Get the local IP address and network range"""
     try:
         # Get the default gateway interface
-        gws = psutil.net_if_addrs()
+        gws = get_interface_addresses()
         stats = psutil.net_if_stats()
         
         # Try to find the active network interface
@@ -411,12 +713,13 @@ def get_local_ip_and_network() -> tuple:
         return "127.0.0.1", "127.0.0.1/32"
 
 
+@cached(cache=TTLCache(maxsize=1, ttl=NETWORK_INFO_TTL_SECONDS), lock=threading.Lock())
 def get_network_interfaces() -> List[NetworkInterface]:
     """Get information about all network interfaces"""
     interfaces = []
     
     try:
-        addrs = psutil.net_if_addrs()
+        addrs = get_interface_addresses()
         stats = psutil.net_if_stats()
         io_counters = psutil.net_io_counters(pernic=True)
         
@@ -463,30 +766,36 @@ def get_network_interfaces() -> List[NetworkInterface]:
     return interfaces
 
 
+# Parsers for `route -n get default` / `ip route` and `scutil --dns` / resolv.conf output
+MAC_GATEWAY_RE = re.compile(r'^\s*gateway:\s*(\S+)', re.M)
+LINUX_GATEWAY_RE = re.compile(r'^default\s+via\s+(\S+)', re.M)
+MAC_DNS_RE = re.compile(r'nameserver\[\d+\]\s*:\s*(\S+)')
+LINUX_DNS_RE = re.compile(r'^nameserver\s+(\S+)', re.M)
+
+
+@cached(cache=TTLCache(maxsize=1, ttl=ROUTING_INFO_TTL_SECONDS), lock=threading.Lock())
 def get_gateway() -> Optional[str]:
     """Get the default gateway IP"""
     try:
-        gateways = psutil.net_if_addrs()
         # Try to get default gateway via routing table
         if platform.system() == "Darwin":  # macOS
             result = subprocess.run(['route', '-n', 'get', 'default'], 
                                   capture_output=True, text=True, timeout=5)
-            for line in result.stdout.split('\n'):
-                if 'gateway:' in line:
-                    return line.split(':')[1].strip()
+            match = MAC_GATEWAY_RE.search(result.stdout)
         elif platform.system() == "Linux":
             result = subprocess.run(['ip', 'route'], 
                                   capture_output=True, text=True, timeout=5)
-            for line in result.stdout.split('\n'):
-                if 'default' in line:
-                    parts = line.split()
-                    if len(parts) > 2:
-                        return parts[2]
+            match = LINUX_GATEWAY_RE.search(result.stdout)
+        else:
+            match = None
+        if match:
+            return match.group(1)
     except Exception:
         pass
     return None
 
 
+@cached(cache=TTLCache(maxsize=1, ttl=ROUTING_INFO_TTL_SECONDS), lock=threading.Lock())
 def get_dns_servers() -> List[str]:
     """Get configured DNS servers"""
     dns_servers = []
@@ -494,19 +803,11 @@ def get_dns_servers() -> List[str]:
         if platform.system() == "Darwin":  # macOS
             result = subprocess.run(['scutil', '--dns'], 
                                   capture_output=True, text=True, timeout=5)
-            for line in result.stdout.split('\n'):
-                if 'nameserver' in line.lower():
-                    parts = line.split(':')
-                    if len(parts) > 1:
-                        dns = parts[1].strip()
-                        if dns and dns not in dns_servers:
-                            dns_servers.append(dns)
+            # scutil lists each resolver's servers, so drop repeats (keeping order)
+            dns_servers = list(dict.fromkeys(MAC_DNS_RE.findall(result.stdout)))
         elif platform.system() == "Linux":
             with open('/etc/resolv.conf', 'r') as f:
-                for line in f:
-                    if line.startswith('nameserver'):
-                        dns = line.split()[1]
-                        dns_servers.append(dns)
+                dns_servers = LINUX_DNS_RE.findall(f.read())
     except Exception:
         pass
     return dns_servers
@@ -516,27 +817,21 @@ def get_dns_servers() -> List[str]:
 
 def calculate_network_metrics(interfaces: List[NetworkInterface]) -> Dict[str, Any]:
     """Calculate network performance metrics"""
+    # Gather each attribute into its own array, then reduce in NumPy
+    n = len(interfaces)
+    is_up = np.fromiter((i.is_up for i in interfaces), dtype=bool, count=n)
+    bytes_sent = np.fromiter((i.bytes_sent or 0 for i in interfaces), dtype=np.int64, count=n)
+    bytes_recv = np.fromiter((i.bytes_recv or 0 for i in interfaces), dtype=np.int64, count=n)
+    speeds = np.fromiter((i.speed_mbps or 0 for i in interfaces), dtype=np.int64, count=n)
+    
     metrics = {
-        "total_bytes_sent": 0,
-        "total_bytes_received": 0,
-        "active_interfaces": 0,
-        "max_interface_speed_mbps": 0,
-        "total_interfaces": len(interfaces),
+        "total_bytes_sent": int(bytes_sent.sum()),
+        "total_bytes_received": int(bytes_recv.sum()),
+        "active_interfaces": int(np.count_nonzero(is_up)),
+        "max_interface_speed_mbps": int(speeds.max(initial=0)),
+        "total_interfaces": n,
     }
     
-    for interface in interfaces:
-        if interface.is_up:
-            metrics["active_interfaces"] += 1
-        
-        if interface.bytes_sent:
-            metrics["total_bytes_sent"] += interface.bytes_sent
-        
-        if interface.bytes_recv:
-            metrics["total_bytes_received"] += interface.bytes_recv
-        
-        if interface.speed_mbps and interface.speed_mbps > metrics["max_interface_speed_mbps"]:
-            metrics["max_interface_speed_mbps"] = interface.speed_mbps
-    
     # Calculate total bandwidth in human-readable format
     metrics["total_sent_gb"] = round(metrics["total_bytes_sent"] / (1024**3), 2)
     metrics["total_recv_gb"] = round(metrics["total_bytes_received"] / (1024**3), 2)
@@ -544,112 +839,254 @@ def calculate_network_metrics(interfaces: List[NetworkInterface]) -> Dict[str, A
     return metrics
 
 
-def generate_network_recommendations(
-    interfaces: List[NetworkInterface],
-    devices: List[NetworkDevice]
-) -> List[str]:
-    """Generate network security and performance recommendations"""
-    recommendations = []
-    
+def generate_interface_recommendations(interfaces: List[NetworkInterface]) -> List[str]:
+    """Generate network security and performance recommendations from the interfaces"""
     # Check interface speeds
-    for interface in interfaces:
-        if interface.is_up and interface.speed_mbps:
-            if interface.speed_mbps < 100:
-                recommendations.append(
-                    f"Interface {interface.name} has low speed ({interface.speed_mbps} Mbps). "
-                    "Consider upgrading to Fast Ethernet (100+ Mbps) or Gigabit Ethernet."
-                )
+    recommendations = [
+        f"Interface {interface.name} has low speed ({interface.speed_mbps} Mbps). "
+        "Consider upgrading to Fast Ethernet (100+ Mbps) or Gigabit Ethernet."
+        for interface in interfaces
+        if interface.is_up and interface.speed_mbps and interface.speed_mbps < 100
+    ]
     
-    # Check for too many devices
-    if len(devices) > 20:
-        recommendations.append(
-            f"High number of devices detected ({len(devices)}). "
-            "Consider network segmentation for better security and performance."
-        )
+    if not recommendations:
+        recommendations.append("Network configuration looks good. No major issues detected.")
     
     # Generic security recommendations
     recommendations.append(
         "Regularly monitor network traffic for suspicious activities using NetSentry's /analyze endpoint."
     )
     
-    if len(recommendations) == 1:  # Only generic recommendation
-        recommendations.insert(0, "Network configuration looks good. No major issues detected.")
-    
     return recommendations
 
 
-# ============================================
-# ML Prediction Functions
-# ============================================
+# The full scan report is reused for NETWORK_SCAN_CACHE_TTL_SECONDS so dashboard
+# polling does not re-run the scan; /network-scan?refresh=true bypasses it
+NETWORK_SCAN_CACHE_TTL_SECONDS = 45
+network_scan_cache = TTLCache(maxsize=1, ttl=NETWORK_SCAN_CACHE_TTL_SECONDS)
 
-def prepare_features_for_prediction(features: MLFeatures) -> pd.DataFrame:
-    """Prepare input features for ML model prediction"""
-    # Convert to dictionary
-    feature_dict = features.dict()
+
+async def run_network_scan() -> NetworkScanReport:
+    """Collect a fresh network analysis report"""
+    # Get local IP and network range, gateway, DNS servers and network interfaces.
+    # These block on subprocesses, syscalls and (for the hostname fallback) name
+    # resolution, so run them concurrently off the event loop
+    (local_ip, network_range), gateway, dns_servers, interfaces = await asyncio.gather(
+        asyncio.to_thread(get_local_ip_and_network),
+        asyncio.to_thread(get_gateway),
+        asyncio.to_thread(get_dns_servers),
+        asyncio.to_thread(get_network_interfaces)
+    )
     
-    # Create dataframe
-    df = pd.DataFrame([feature_dict])
+    # No device discovery (nmap removed)
+    discovered_devices = []
     
-    # Encode categorical variables
-    categorical_cols = ['protocol_type', 'service', 'flag']
-    for col in categorical_cols:
-        if col in ml_models['encoders']:
-            le = ml_models['encoders'][col]
-            try:
-                df[col + '_encoded'] = le.transform(df[col])
-            except ValueError:
-                # If value not seen during training, use most common class
-                df[col + '_encoded'] = 0
+    # Calculate network metrics
+    network_metrics = calculate_network_metrics(interfaces)
+    
+    # Generate recommendations (no discovered devices, so only interface checks apply)
+    recommendations = generate_interface_recommendations(interfaces)
     
+    return NetworkScanReport(
+        status="success",
+        scan_timestamp=utc_clock.now_iso(),
+        local_ip=local_ip,
+        network_range=network_range,
+        gateway=gateway,
+        dns_servers=dns_servers,
+        interfaces=interfaces,
+        discovered_devices=discovered_devices,
+        network_metrics=network_metrics,
+        recommendations=recommendations
+    )
+
+
+# ============================================
+# ML Prediction Functions
+# ============================================
+
+def prepare_features_for_prediction(features: MLFeatures) -> np.ndarray:
+    """
+    Prepare input features for ML model prediction as a (1, n_features) row.
+    Built as float32, the dtype both ONNX Runtime and sklearn's trees compare in.
+    """
     # Use the exact feature list from training
-    if ml_models['features'] is None:
+    if ml_models['feature_plan'] is None:
         raise ValueError("Feature list not loaded from training")
     
-    # Get the feature columns used during training
-    training_features = ml_models['features']
-    
-    # Create a dataframe with all required features, filling missing ones with 0
-    X = pd.DataFrame(columns=training_features)
-    
-    # Fill in the features we have
-    for feature in training_features:
-        if feature in df.columns:
-            X[feature] = df[feature].values
-        else:
-            # Fill missing features with 0
-            X[feature] = 0
-    
-    # Ensure correct data types
-    X = X.astype(float)
-    
-    return X
+    plan = ml_models['feature_plan']
+    # Categorical values not seen during training use code 0 (most common class)
+    values = (
+        getattr(features, field, 0) if encoding is None else encoding.get(getattr(features, field, 0), 0)
+        for field, encoding in plan
+    )
+    return np.fromiter(values, dtype=np.float32, count=len(plan)).reshape(1, -1)
 
 
-def predict_binary(features: MLFeatures) -> MLPredictionResponse:
+def predict_proba_batch(model_key: str, X: np.ndarray) -> np.ndarray:
+    """
+    Class probabilities for a (n_samples, n_features) matrix, columns ordered as classes_.
+    Uses the ONNX Runtime session when one was exported, else the sklearn forest.
+    """
+    parallel = len(X) >= PARALLEL_BATCH_MIN_ROWS and INFERENCE_THREADS > 1
+    session = ml_models[model_key + '_onnx']
+    if session is not None:
+        if parallel and ml_models[model_key + '_onnx_parallel'] is not None:
+            session = ml_models[model_key + '_onnx_parallel']
+        input_name = session.get_inputs()[0].name
+        return session.run(['probabilities'], {input_name: X.astype(np.float32, copy=False)})[0]
+    frame = pd.DataFrame(X, columns=ml_models['features'])
+    if parallel:
+        # Tree traversal releases the GIL, so a thread per core scales across trees
+        with joblib.parallel_backend('threading', n_jobs=INFERENCE_THREADS):
+            return ml_models[model_key].predict_proba(frame)
+    return ml_models[model_key].predict_proba(frame)
+
+
+class PredictionBatcher:
+    """
+    Coalesce concurrent predictions for one model into a single predict_proba call.
+
+    Requests are queued as (feature_row, future) pairs. A background task waits
+    for the first item, takes whatever else is already queued (up to max_batch
+    rows) without waiting for more, runs the model once on the stacked rows and
+    resolves every future with its own probability row. An idle request is
+    dispatched immediately; under load, rows that arrive while a batch is being
+    evaluated form the next batch.
+    """
+
+    def __init__(self, model_key: str, max_batch: int = 128):
+        self.model_key = model_key
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # (max_batch, n_features) float32 matrix reused for every batch
+        self._buffer: Optional[np.ndarray] = None
+
+    def start(self):
+        """Start the batching task on the running event loop"""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the batching task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row: np.ndarray) -> np.ndarray:
+        """Queue a single (1, n_features) row and wait for its class probabilities"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self) -> list:
+        """Wait for one pending row, then drain the rows already queued behind it"""
+        items = [await self._queue.get()]
+        while len(items) < self.max_batch and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    def _fill_batch(self, items: list) -> np.ndarray:
+        """Copy the pending rows into the preallocated batch matrix and return the filled part"""
+        n_features = items[0][0].shape[-1]
+        if self._buffer is None or self._buffer.shape[1] != n_features:
+            self._buffer = np.empty((self.max_batch, n_features), dtype=np.float32)
+        X = self._buffer[:len(items)]
+        for i, (row, _) in enumerate(items):
+            X[i] = row
+        return X
+
+    async def _run(self):
+        while True:
+            items = await self._collect()
+            try:
+                X = self._fill_batch(items)
+                # Inference runs off the event loop (ONNX Runtime releases the GIL), so
+                # other requests are served meanwhile and queue up for the next batch
+                probabilities = await asyncio.to_thread(predict_proba_batch, self.model_key, X)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), proba in zip(items, probabilities):
+                if not future.done():
+                    future.set_result(proba)
+
+
+# One batcher per model; started in the app lifespan
+prediction_batchers = {
+    'binary': PredictionBatcher('binary'),
+    'multi': PredictionBatcher('multi'),
+}
+
+
+class PredictionCache:
+    """Bounded, thread-safe TTL cache of class probabilities keyed by the prepared feature row"""
+
+    def __init__(self, maxsize: int = 8192, ttl: float = 300):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key: bytes, value: np.ndarray):
+        with self._lock:
+            self._cache[key] = value
+
+
+# Many flows share the same feature vector, so repeat queries skip the model entirely
+prediction_caches = {
+    'binary': PredictionCache(),
+    'multi': PredictionCache(),
+}
+
+
+async def predict_proba_cached(model_key: str, X: np.ndarray) -> np.ndarray:
+    """Class probabilities for one prepared row, from the cache or the model's batcher"""
+    key = X.tobytes()
+    probabilities = prediction_caches[model_key].get(key)
+    if probabilities is None:
+        probabilities = await prediction_batchers[model_key].submit(X)
+        prediction_caches[model_key].set(key, probabilities)
+    return probabilities
+
+
+# Response labels of the binary classifier's classes_ (0 = normal, 1 = attack)
+BINARY_LABELS = ("Normal", "Attack")
+
+
+async def predict_binary(features: MLFeatures) -> MLPredictionResponse:
     """Predict if traffic is normal or attack (binary classification)"""
-    if not models_loaded or ml_models['binary'] is None:
+    if not models_loaded or not model_available('binary'):
         return MLPredictionResponse(
             status="error",
             model_available=False,
             message="ML model not loaded. Please train the model first.",
-            timestamp=datetime.utcnow().isoformat()
+            timestamp=utc_clock.now_iso()
         )
     
     try:
         # Prepare features
         X = prepare_features_for_prediction(features)
         
-        # Debug logging
-        print(f"Prepared features shape: {X.shape}")
-        print(f"Feature columns: {X.columns.tolist()}")
-        
-        # Make prediction
-        prediction = ml_models['binary'].predict(X)[0]
-        probabilities = ml_models['binary'].predict_proba(X)[0]
+        # Make prediction (predict() is argmax over predict_proba, so run the forest once)
+        probabilities = await predict_proba_cached('binary', X)
+        index = int(np.argmax(probabilities))
+        prediction = ml_models['binary_classes'][index]
         
         # Get prediction label
-        prediction_label = "Normal" if prediction == 0 else "Attack"
-        confidence = float(probabilities[prediction])
+        prediction_label = BINARY_LABELS[index]
+        confidence = float(probabilities[index])
         
         return MLPredictionResponse(
             status="success",
@@ -657,12 +1094,9 @@ def predict_binary(features: MLFeatures) -> MLPredictionResponse:
             prediction=str(prediction),
             prediction_label=prediction_label,
             confidence=round(confidence, 4),
-            probabilities={
-                "Normal": round(float(probabilities[0]), 4),
-                "Attack": round(float(probabilities[1]), 4)
-            },
+            probabilities=dict(zip(BINARY_LABELS, probabilities.astype(np.float64).round(4).tolist())),
             message=f"Prediction: {prediction_label} (confidence: {confidence:.2%})",
-            timestamp=datetime.utcnow().isoformat()
+            timestamp=utc_clock.now_iso()
         )
     
     except Exception as e:
@@ -673,43 +1107,35 @@ def predict_binary(features: MLFeatures) -> MLPredictionResponse:
             status="error",
             model_available=True,
             message=f"Prediction failed: {str(e)}",
-            timestamp=datetime.utcnow().isoformat()
+            timestamp=utc_clock.now_iso()
         )
 
 
-def predict_multiclass(features: MLFeatures) -> MLPredictionResponse:
+async def predict_multiclass(features: MLFeatures) -> MLPredictionResponse:
     """Predict attack type (multi-class classification: normal, dos, probe, r2l, u2r)"""
-    if not models_loaded or ml_models['multi'] is None:
+    if not models_loaded or not model_available('multi'):
         return MLPredictionResponse(
             status="error",
             model_available=False,
             message="ML model not loaded. Please train the model first.",
-            timestamp=datetime.utcnow().isoformat()
+            timestamp=utc_clock.now_iso()
         )
     
     try:
         # Prepare features
         X = prepare_features_for_prediction(features)
         
-        # Debug logging
-        print(f"Prepared features shape: {X.shape}")
-        
-        # Make prediction
-        prediction = ml_models['multi'].predict(X)[0]
-        probabilities = ml_models['multi'].predict_proba(X)[0]
-        
-        # Get class names
-        classes = ml_models['multi'].classes_
+        # Make prediction (predict() is argmax over predict_proba, so run the forest once)
+        probabilities = await predict_proba_cached('multi', X)
+        index = int(np.argmax(probabilities))
+        prediction = str(ml_models['multi_classes'][index])
         
         # Get prediction label
-        prediction_label = prediction.upper()
-        confidence = float(probabilities[list(classes).index(prediction)])
+        prediction_label = ml_models['multi_labels'][index]
+        confidence = float(probabilities[index])
         
-        # Create probabilities dictionary
-        proba_dict = {
-            cls.upper(): round(float(prob), 4) 
-            for cls, prob in zip(classes, probabilities)
-        }
+        # Create probabilities dictionary (round as float64 so values like 0.8739 stay exact)
+        proba_dict = dict(zip(ml_models['multi_labels'], probabilities.astype(np.float64).round(4).tolist()))
         
         return MLPredictionResponse(
             status="success",
@@ -719,7 +1145,7 @@ def predict_multiclass(features: MLFeatures) -> MLPredictionResponse:
             confidence=round(confidence, 4),
             probabilities=proba_dict,
             message=f"Prediction: {prediction_label} (confidence: {confidence:.2%})",
-            timestamp=datetime.utcnow().isoformat()
+            timestamp=utc_clock.now_iso()
         )
     
     except Exception as e:
@@ -730,7 +1156,7 @@ def predict_multiclass(features: MLFeatures) -> MLPredictionResponse:
             status="error",
             model_available=True,
             message=f"Prediction failed: {str(e)}",
-            timestamp=datetime.utcnow().isoformat()
+            timestamp=utc_clock.now_iso()
         )
 
 
@@ -773,30 +1199,67 @@ async def analyze_traffic(log: NetworkLog):
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_traffic_batch(request: Request):
+    """
+    Analyze a batch of network traffic logs sent as NDJSON
+    
+    Request Body (Content-Type: application/x-ndjson):
+    - One NetworkLog JSON object per line (same fields as /analyze)
+    
+    Returns:
+    - Alerts for each log, in input order
+    """
+    body = await request.body()
+    try:
+        raw_logs = [orjson.loads(line) for line in body.splitlines() if line.strip()]
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid NDJSON: {str(e)}")
+    
+    try:
+        logs = network_log_list_adapter.validate_python(raw_logs)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    
+    try:
+        results = [analyze_log(log) for log in logs]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    
+    total_alerts = sum(len(alerts) for alerts in results)
+    return BatchAnalysisResponse(
+        status="alert" if total_alerts else "clean",
+        alerts=results,
+        message=f"Analyzed {len(logs)} log(s), detected {total_alerts} anomaly/anomalies"
+    )
+
+
 @app.get("/alerts", response_model=Dict[str, Any])
 async def get_alerts(
     severity: Optional[str] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = Query(None, ge=0)
 ):
     """
     Retrieve all stored alerts
     
     Query Parameters:
     - severity: Filter by severity (LOW, MEDIUM, HIGH, CRITICAL)
-    - limit: Maximum number of alerts to return
+    - limit: Maximum number of alerts to return (non-negative)
     
     Returns:
     - List of all alerts with metadata
     """
-    filtered_alerts = alerts_database
-    
     # Filter by severity if provided
     if severity:
-        filtered_alerts = [a for a in filtered_alerts if a.severity == severity.upper()]
-    
-    # Apply limit if provided
-    if limit:
-        filtered_alerts = filtered_alerts[-limit:]
+        filtered_alerts = [a for a in alerts_database if a.severity == severity.upper()]
+        # Apply limit if provided
+        if limit:
+            filtered_alerts = filtered_alerts[-limit:]
+    elif limit:
+        # Most recent `limit` alerts, read from the right end of the deque
+        filtered_alerts = list(itertools.islice(reversed(alerts_database), limit))[::-1]
+    else:
+        filtered_alerts = list(alerts_database)
     
     return {
         "total_alerts": len(alerts_database),
@@ -815,7 +1278,7 @@ async def health_check():
     """
     return HealthResponse(
         status="ok",
-        timestamp=datetime.utcnow().isoformat(),
+        timestamp=utc_clock.now_iso(),
         version="1.0.0"
     )
 
@@ -829,6 +1292,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /analyze": "Analyze network traffic log (rule-based)",
+            "POST /analyze/batch": "Analyze NDJSON batch of traffic logs (rule-based)",
             "GET /alerts": "Retrieve stored alerts",
             "GET /health": "Health check",
             "GET /stats": "Get system statistics",
@@ -856,6 +1320,8 @@ async def clear_alerts():
     Clear all stored alerts (for testing/demo purposes)
     """
     alerts_database.clear()
+    severity_counter.clear()
+    type_counter.clear()
     login_attempts.clear()
     return {"message": "All alerts cleared", "status": "success"}
 
@@ -865,24 +1331,19 @@ async def get_statistics():
     """
     Get system statistics
     """
-    severity_counts = defaultdict(int)
-    type_counts = defaultdict(int)
-    
-    for alert in alerts_database:
-        severity_counts[alert.severity] += 1
-        type_counts[alert.alert_type] += 1
-    
+    # Counters are kept up to date as alerts are stored; unary + drops
+    # entries whose alerts have all been evicted
     return {
         "total_alerts": len(alerts_database),
-        "by_severity": dict(severity_counts),
-        "by_type": dict(type_counts),
+        "by_severity": dict(+severity_counter),
+        "by_type": dict(+type_counter),
         "monitored_ips": len(login_attempts),
         "suspicious_ip_count": len(SUSPICIOUS_IPS)
     }
 
 
 @app.get("/network-scan", response_model=NetworkScanReport)
-async def scan_network():
+async def scan_network(refresh: bool = False):
     """
     Perform comprehensive network analysis
     
@@ -893,43 +1354,18 @@ async def scan_network():
     - Network performance metrics
     - Security and performance recommendations
     
+    Query Parameters:
+    - refresh: Rebuild the report instead of returning the cached one (up to 45s old)
+    
     Returns:
     - Comprehensive network analysis report
     """
     try:
-        # Get local IP and network range
-        local_ip, network_range = get_local_ip_and_network()
-        
-        # Get network interfaces
-        interfaces = get_network_interfaces()
-        
-        # Get gateway and DNS servers
-        gateway = get_gateway()
-        dns_servers = get_dns_servers()
-        
-        # No device discovery (nmap removed)
-        discovered_devices = []
-        
-        # Calculate network metrics
-        network_metrics = calculate_network_metrics(interfaces)
-        
-        # Generate recommendations
-        recommendations = generate_network_recommendations(
-            interfaces, discovered_devices
-        )
-        
-        return NetworkScanReport(
-            status="success",
-            scan_timestamp=datetime.utcnow().isoformat(),
-            local_ip=local_ip,
-            network_range=network_range,
-            gateway=gateway,
-            dns_servers=dns_servers,
-            interfaces=interfaces,
-            discovered_devices=discovered_devices,
-            network_metrics=network_metrics,
-            recommendations=recommendations
-        )
+        report = None if refresh else network_scan_cache.get('report')
+        if report is None:
+            report = await run_network_scan()
+            network_scan_cache['report'] = report
+        return report
     
     except Exception as e:
         raise HTTPException(
@@ -951,7 +1387,7 @@ async def predict_binary_endpoint(features: MLFeatures):
     - Confidence score
     - Probability for each class
     """
-    return predict_binary(features)
+    return await predict_binary(features)
 
 
 @app.post("/predict/multiclass", response_model=MLPredictionResponse)
@@ -967,23 +1403,15 @@ async def predict_multiclass_endpoint(features: MLFeatures):
     - Confidence score
     - Probability for each attack type
     """
-    return predict_multiclass(features)
+    return await predict_multiclass(features)
 
 
-@app.get("/ml/status")
-async def ml_model_status():
-    """
-    Check ML model status and availability
-    
-    Returns:
-    - Model loading status
-    - Available models
-    - Model information
-    """
+def build_ml_status() -> Dict[str, Any]:
+    """Model status payload; only changes when the models are (re)loaded"""
     return {
         "models_loaded": models_loaded,
-        "binary_model_available": ml_models['binary'] is not None,
-        "multiclass_model_available": ml_models['multi'] is not None,
+        "binary_model_available": model_available('binary'),
+        "multiclass_model_available": model_available('multi'),
         "encoders_available": ml_models['encoders'] is not None,
         "features_count": len(ml_models['features']) if ml_models['features'] else 0,
         "message": "ML models ready" if models_loaded else "ML models not loaded. Train models using the notebook.",
@@ -994,7 +1422,36 @@ async def ml_model_status():
     }
 
 
+# Serialized /ml/status response, built on first request after the models load
+ml_status_body: Optional[bytes] = None
+
+
+@app.get("/ml/status")
+async def ml_model_status():
+    """
+    Check ML model status and availability
+    
+    Returns:
+    - Model loading status
+    - Available models
+    - Model information
+    """
+    global ml_status_body
+    if ml_status_body is None:
+        ml_status_body = orjson.dumps(build_ml_status())
+    return Response(content=ml_status_body, media_type="application/json")
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Same settings as the Docker image. Alerts and login tracking live in memory per
+    # worker, so extra workers (WEB_CONCURRENCY) only suit stateless /predict traffic
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+        loop="uvloop",
+        http="httptools"
+    )
 
@@ -0,0 +1,52 @@
+"""
+NetSentry - Export trained Random Forest models to ONNX
+
+Converts the scikit-learn classifiers saved by the training notebook into
+ONNX graphs that the API serves with ONNX Runtime. Re-run after retraining:
+
+    python modelBuilding/export_onnx.py
+
+Requires skl2onnx (offline only, not needed by the API at runtime).
+"""
+
+import os
+import json
+import joblib
+import numpy as np
+from skl2onnx import to_onnx
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+# (sklearn pickle, ONNX output)
+MODELS = [
+    ('rf_binary_classifier.pkl', 'rf_binary_classifier.onnx'),
+    ('rf_multiclass_classifier.pkl', 'rf_multiclass_classifier.onnx'),
+]
+
+
+def export_model(pkl_name: str, onnx_name: str, n_features: int):
+    """
+    Convert one classifier, emitting raw probabilities instead of a ZipMap of dicts.
+    The class labels are stored in the model metadata so the API can serve the
+    ONNX model without unpickling the sklearn forest.
+    """
+    clf = joblib.load(os.path.join(MODELS_DIR, pkl_name))
+    sample = np.zeros((1, n_features), dtype=np.float32)
+    onnx_model = to_onnx(
+        clf,
+        sample,
+        options={id(clf): {'zipmap': False}},
+        target_opset={'': 17, 'ai.onnx.ml': 3}
+    )
+    meta = onnx_model.metadata_props.add()
+    meta.key = 'classes'
+    meta.value = json.dumps(clf.classes_.tolist())
+    with open(os.path.join(MODELS_DIR, onnx_name), 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"✓ {pkl_name} -> {onnx_name}")
+
+
+if __name__ == "__main__":
+    features = joblib.load(os.path.join(MODELS_DIR, 'feature_columns.pkl'))
+    for pkl_name, onnx_name in MODELS:
+        export_model(pkl_name, onnx_name, len(features))
@@ -47,5 +47,17 @@ echo "7. Get Statistics"
 curl -s -X GET $BASE_URL/stats | python3 -m json.tool
 echo -e "\n"
 
+echo "8. Batch Analysis (NDJSON)"
+curl -s -X POST $BASE_URL/analyze/batch \
+  -H "Content-Type: application/x-ndjson" \
+  --data-binary $'{"src_ip":"192.168.100.100","dst_ip":"10.0.0.1","protocol":"TCP"}\n{"src_ip":"192.168.1.25","dst_ip":"8.8.8.8","protocol":"DNS","payload":"malware-c2server.tk"}\n{"src_ip":"192.168.1.10","dst_ip":"8.8.8.8","protocol":"TCP"}' | python3 -m json.tool
+echo -e "\n"
+
+echo "9. Out-of-Order Login Attempts Hours Apart (should stay clean)"
+curl -s -X POST $BASE_URL/analyze/batch \
+  -H "Content-Type: application/x-ndjson" \
+  --data-binary $'{"src_ip":"203.0.114.77","dst_ip":"192.168.1.100","protocol":"HTTP","payload":"POST /login","timestamp":"2024-01-01T12:00:00"}\n{"src_ip":"203.0.114.77","dst_ip":"192.168.1.100","protocol":"HTTP","payload":"POST /login","timestamp":"2024-01-01T11:00:00"}\n{"src_ip":"203.0.114.77","dst_ip":"192.168.1.100","protocol":"HTTP","payload":"POST /login","timestamp":"2024-01-01T10:00:00"}\n{"src_ip":"203.0.114.77","dst_ip":"192.168.1.100","protocol":"HTTP","payload":"POST /login","timestamp":"2024-01-01T09:00:00"}\n{"src_ip":"203.0.114.77","dst_ip":"192.168.1.100","protocol":"HTTP","payload":"POST /login","timestamp":"2024-01-01T08:00:00"}' | python3 -m json.tool
+echo -e "\n"
+
 echo "=== Test Complete ==="
 